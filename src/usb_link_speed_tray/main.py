@@ -4,25 +4,29 @@ from __future__ import annotations
 
 import argparse
 import logging
-import re
+import os
+import select
 import sys
 import tempfile
-import time
+import zlib
+from collections import Counter
 from pathlib import Path
 from threading import Thread
 
-# AppIndicator3 (SNI) + GTK; same stack as rclone-bisync-manager.
+from .sysfs import (
+    get_mount_points,
+    get_usb_storage_speeds,
+    open_mountinfo_watch,
+    open_uevent_socket,
+    read_link_speeds,
+    read_mountinfo,
+    wait_for_change,
+)
+
+# AppIndicator3 (SNI) + GTK; same stack as rclone-bisync-manager. Imported by _load_gtk_backend() from run(),
+# so importing this module (or --help) does not pay for the GUI stack.
 APPINDICATOR_AVAILABLE = False
-try:
-    import gi
-
-    gi.require_version("Gtk", "3.0")
-    gi.require_version("AppIndicator3", "0.1")
-    from gi.repository import AppIndicator3, GLib, Gtk
-
-    APPINDICATOR_AVAILABLE = True
-except (ImportError, ValueError):
-    Gtk = GLib = AppIndicator3 = None  # type: ignore[misc, assignment]
+Gtk = GLib = AppIndicator3 = None  # type: ignore[misc, assignment]
 
 # In-code SVG for tray icon (USB flash drive: connector, body, spoked indicator).
 _TRAY_ICON_SVG = '''
@@ -47,14 +51,64 @@ _TRAY_ICON_SIZE = 64
 _APP_ID = "usb-link-speed-tray"
 _TRAY_ICON_FILENAME = "usb-link-speed-tray-icon.png"
 
-SYS_BLOCK = Path("/sys/block")
-SYS_USB_DEVICES = Path("/sys/bus/usb/devices")
-PROC_MOUNTINFO = Path("/proc/self/mountinfo")
-REFRESH_INTERVAL_MS = 3000
+# Device and mount changes are event-driven (kernel uevents, mountinfo POLLPRI); the timer only re-reads link speeds.
+REFRESH_INTERVAL_MS = 10000
+_FALLBACK_REFRESH_INTERVAL_MS = 3000  # plain polling when the uevent socket is unavailable
 
 logger = logging.getLogger(__name__)
 
 
+def _tray_icon_svg() -> str:
+    """In-code SVG with the tray icon color and stroke filled in."""
+    return _TRAY_ICON_SVG.format(
+        color=_TRAY_ICON_COLOR,
+        thickness=_TRAY_ICON_STROKE,
+    ).strip()
+
+
+def _tray_icon_path() -> Path:
+    """Return the tray icon PNG from the user cache, rendering it (cairosvg + PIL) only when missing.
+    The file name carries a checksum of SVG and size, so changing the icon invalidates the cache."""
+    key = zlib.crc32(f"{_TRAY_ICON_SIZE}:{_tray_icon_svg()}".encode("utf-8"))
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / _APP_ID
+    icon_path = cache_dir / f"icon-{key:08x}.png"
+    if icon_path.is_file():
+        return icon_path
+    tmp_path: Path | None = None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Per-process temp name so concurrent starts don't race on it; replace() never leaves a half-written icon.
+        with tempfile.NamedTemporaryFile(dir=cache_dir, prefix="icon-", suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        _render_tray_icon_to_path(tmp_path)
+        os.replace(tmp_path, icon_path)
+        return icon_path
+    except OSError as e:
+        logger.debug("icon cache unavailable (%s), using temp dir", e)
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+    icon_path = Path(tempfile.gettempdir()) / _TRAY_ICON_FILENAME
+    _render_tray_icon_to_path(icon_path)
+    return icon_path
+
+
+def _load_gtk_backend() -> bool:
+    """Import gi / AppIndicator3 / GTK into the module globals. Returns APPINDICATOR_AVAILABLE."""
+    global APPINDICATOR_AVAILABLE, AppIndicator3, GLib, Gtk
+    if APPINDICATOR_AVAILABLE:
+        return True
+    try:
+        import gi
+
+        gi.require_version("Gtk", "3.0")
+        gi.require_version("AppIndicator3", "0.1")
+        from gi.repository import AppIndicator3, GLib, Gtk
+    except (ImportError, ValueError):
+        return False
+    APPINDICATOR_AVAILABLE = True
+    return True
+
+
 def _render_tray_icon_to_path(path: str | Path) -> None:
     """Render in-code SVG to PNG at path (for tray icon). Same pattern as rclone-bisync-manager."""
     from io import BytesIO
@@ -62,12 +116,8 @@ def _render_tray_icon_to_path(path: str | Path) -> None:
     from cairosvg import svg2png
     from PIL import Image
 
-    svg_code = _TRAY_ICON_SVG.format(
-        color=_TRAY_ICON_COLOR,
-        thickness=_TRAY_ICON_STROKE,
-    )
     png_data = svg2png(
-        bytestring=svg_code.strip().encode("utf-8"),
+        bytestring=_tray_icon_svg().encode("utf-8"),
         output_width=_TRAY_ICON_SIZE,
         output_height=_TRAY_ICON_SIZE,
     )
@@ -75,160 +125,6 @@ def _render_tray_icon_to_path(path: str | Path) -> None:
     img.save(path, "PNG")
 
 
-def _block_device_usb_path(block_name: str) -> str | None:
-    """Resolve block device (e.g. sda) to USB bus path (e.g. 2-3)."""
-    device_path = SYS_BLOCK / block_name / "device"
-    if not device_path.exists():
-        return None
-    try:
-        target = device_path.resolve()
-        for part in target.parts:
-            if re.match(r"^usb\d+$", part):
-                idx = target.parts.index(part)
-                if idx + 1 < len(target.parts):
-                    return target.parts[idx + 1]
-        return None
-    except (OSError, ValueError):
-        return None
-
-
-def _read_speed_mbps(usb_path: str) -> int | None:
-    """Read link speed in Mbps from sysfs."""
-    speed_file = SYS_USB_DEVICES / usb_path / "speed"
-    if not speed_file.exists():
-        return None
-    try:
-        return int(speed_file.read_text().strip())
-    except (OSError, ValueError):
-        return None
-
-
-def _get_block_dev_numbers(block_name: str, *, _debug: bool = False) -> set[str]:
-    """Return set of major:minor for this block device and its partitions (e.g. {'8:0', '8:1'})."""
-    result: set[str] = set()
-    block_dir = SYS_BLOCK / block_name
-    if not block_dir.is_dir():
-        return result
-    dev_file = block_dir / "dev"
-    if dev_file.exists():
-        try:
-            result.add(dev_file.read_text().strip())
-        except OSError:
-            pass
-    prefix = block_name
-    for entry in block_dir.iterdir():
-        if not entry.is_dir():
-            continue
-        name = entry.name
-        if name.startswith(prefix) and len(name) > len(prefix) and name[len(prefix)].isdigit():
-            part_dev = entry / "dev"
-            if part_dev.exists():
-                try:
-                    result.add(part_dev.read_text().strip())
-                except OSError:
-                    pass
-    return result
-
-
-def _device_path_matches_block(device_path: str, block_name: str) -> bool:
-    """True if device path (after resolve) is this block or a partition (e.g. /dev/sda1 -> sda)."""
-    try:
-        name = Path(device_path).resolve().name
-    except (OSError, ValueError):
-        return False
-    if name == block_name:
-        return True
-    if name.startswith(block_name) and len(name) > len(block_name) and name[len(block_name)].isdigit():
-        return True
-    return False
-
-
-def _dm_device_backed_by_block(device_path: str, block_name: str) -> bool:
-    """True if device is a dm (e.g. /dev/mapper/veracrypt1 -> dm-0) backed by this block (sda/sda1)."""
-    if not device_path.startswith("/dev/"):
-        return False
-    try:
-        name = Path(device_path).resolve().name
-    except (OSError, ValueError):
-        return False
-    if not name.startswith("dm-"):
-        return False
-    slaves_dir = SYS_BLOCK / name / "slaves"
-    if not slaves_dir.is_dir():
-        return False
-    for slave in slaves_dir.iterdir():
-        slave_name = slave.name
-        if slave_name == block_name:
-            return True
-        if slave_name.startswith(block_name) and len(slave_name) > len(block_name) and slave_name[len(block_name)].isdigit():
-            return True
-    return False
-
-
-def _parse_mountinfo_line(line: str):
-    """Parse one mountinfo line. Returns (major_minor, mount_point, device_path) or None."""
-    parts = line.split()
-    if len(parts) < 10:
-        return None
-    major_minor = parts[2]
-    mount_point = parts[4].replace("\\040", " ")
-    try:
-        hyphen_idx = parts.index("-")
-        device_path = parts[hyphen_idx + 2] if hyphen_idx + 2 < len(parts) else ""
-    except ValueError:
-        device_path = ""
-    return (major_minor, mount_point, device_path)
-
-
-def get_mount_points(block_name: str, *, _debug: bool = False) -> list[str]:
-    """Return mount points for this block device from /proc/self/mountinfo.
-    Matches by major:minor (8:0, 8:1), by device path (/dev/sda, /dev/sda1), or by dm device backed by this block (e.g. VeraCrypt)."""
-    dev_numbers = _get_block_dev_numbers(block_name, _debug=_debug)
-    if _debug:
-        logger.debug("get_mount_points: %s dev_numbers %s", block_name, dev_numbers)
-    result: list[str] = []
-    if not PROC_MOUNTINFO.exists():
-        return result
-    try:
-        for line in PROC_MOUNTINFO.read_text().splitlines():
-            parsed = _parse_mountinfo_line(line)
-            if parsed is None:
-                continue
-            major_minor, mount_point, device_path = parsed
-            matched = (
-                major_minor in dev_numbers
-                or (device_path.startswith("/dev/") and _device_path_matches_block(device_path, block_name))
-                or (device_path.startswith("/dev/") and _dm_device_backed_by_block(device_path, block_name))
-            )
-            if matched:
-                result.append(mount_point)
-    except (OSError, ValueError):
-        pass
-    if _debug:
-        logger.debug("get_mount_points: %s -> %s", block_name, result)
-    return result
-
-
-def get_usb_storage_speeds() -> list[tuple[str, int | None]]:
-    """Return list of (block_name, speed_mbps) for USB block devices."""
-    result: list[tuple[str, int | None]] = []
-    if not SYS_BLOCK.exists():
-        logger.debug("sys block path does not exist: %s", SYS_BLOCK)
-        return result
-    for entry in SYS_BLOCK.iterdir():
-        if not entry.is_dir():
-            continue
-        name = entry.name
-        usb_path = _block_device_usb_path(name)
-        if usb_path is None:
-            logger.debug("block %s is not USB, skipping", name)
-            continue
-        speed = _read_speed_mbps(usb_path)
-        logger.debug("USB block %s path %s speed %s Mbps", name, usb_path, speed)
-        result.append((name, speed))
-    return result
-
-
 def format_speed(mbps: int | None) -> str:
     """Format speed for display (e.g. 5000 -> '5 Gbps')."""
     if mbps is None:
@@ -236,7 +132,8 @@ def format_speed(mbps: int | None) -> str:
     if mbps >= 10000:
         return f"{mbps // 1000} Gbps"
     if mbps >= 1000:
-        return f"{mbps / 1000:.1f} Gbps"
+        gbps, rest = divmod(mbps, 1000)  # integer-only: sysfs speeds are whole Mbps
+        return f"{gbps}.{rest // 100} Gbps"
     return f"{mbps} Mbps"
 
 
@@ -245,60 +142,91 @@ _SPEC_TYPE = "type"
 _SPEC_LABEL = "label"
 _SPEC_ENABLED = "enabled"
 _SPEC_CALLBACK = "callback"
+_SPEC_KEY = "key"  # stable identity of a menu entry across updates
 _SPEC_ITEM = "item"
 _SPEC_SEPARATOR = "separator"
 
 
-def _build_gtk_menu(spec: list[dict]) -> Gtk.Menu | None:
-    """Build Gtk.Menu from menu spec list (AppIndicator backend)."""
+def _new_gtk_menu_item(s: dict) -> Gtk.MenuItem:
+    """Create the Gtk.MenuItem for one spec entry; label and sensitivity are set by _sync_gtk_menu."""
+    if s.get(_SPEC_TYPE) == _SPEC_SEPARATOR:
+        return Gtk.SeparatorMenuItem()
+    item = Gtk.MenuItem.new_with_label(str(s.get(_SPEC_LABEL, "")))
+    if s.get(_SPEC_CALLBACK):
+        cb = s[_SPEC_CALLBACK]
+        item.connect("activate", lambda w, c=cb: c(w) if c else None)
+    return item
+
+
+def _sync_gtk_menu(menu: Gtk.Menu, items: dict[str, Gtk.MenuItem], spec: list[dict]) -> None:
+    """Update a persistent Gtk.Menu in place from menu spec (AppIndicator backend).
+    items maps _SPEC_KEY to its widget: existing items get label/sensitivity updated, new ones are inserted,
+    vanished ones removed, so the indicator's menu is never replaced."""
     if not APPINDICATOR_AVAILABLE:
-        return None
-    menu = Gtk.Menu()
-    for s in spec or []:
-        if not isinstance(s, dict):
-            continue
-        if s.get(_SPEC_TYPE) == _SPEC_SEPARATOR:
-            menu.append(Gtk.SeparatorMenuItem())
-        elif s.get(_SPEC_TYPE) == _SPEC_ITEM:
-            label = s.get(_SPEC_LABEL, "")
-            item = Gtk.MenuItem.new_with_label(str(label))
+        return
+    spec = [s for s in spec or [] if isinstance(s, dict)]
+    keys = {s[_SPEC_KEY] for s in spec}
+    for key in [k for k in items if k not in keys]:
+        menu.remove(items.pop(key))
+    for pos, s in enumerate(spec):
+        key = s[_SPEC_KEY]
+        item = items.get(key)
+        if item is None:
+            item = _new_gtk_menu_item(s)
+            items[key] = item
+            menu.insert(item, pos)
+            item.show()
+        elif menu.get_children()[pos] is not item:
+            menu.reorder_child(item, pos)
+        if s.get(_SPEC_TYPE) == _SPEC_ITEM:
+            label = str(s.get(_SPEC_LABEL, ""))
+            if item.get_label() != label:
+                item.set_label(label)
             item.set_sensitive(s.get(_SPEC_ENABLED, True))
-            if s.get(_SPEC_CALLBACK):
-                cb = s[_SPEC_CALLBACK]
-                item.connect("activate", lambda w, c=cb: c(w) if c else None)
-            menu.append(item)
-    menu.show_all()
-    return menu
-
-
-def _menu_state(devices: list[tuple[str, int | None]], *, debug: bool = False) -> tuple[tuple[str, int | None, tuple[str, ...]], ...]:
-    """Return comparable state (devices + speeds + mount points) for change detection. Sorted by block_name so order is stable."""
-    rows: list[tuple[str, int | None, tuple[str, ...]]] = []
-    for block_name, speed in devices:
-        mounts = tuple(sorted(get_mount_points(block_name, _debug=debug)))
-        rows.append((block_name, speed, mounts))
-    rows.sort(key=lambda r: r[0])  # canonical order so state compares equal when data is same
-    return tuple(rows)
-
-
-def _get_menu_spec(devices: list[tuple[str, int | None]], *, debug: bool = False) -> list[dict]:
-    """Build menu spec: device rows, separator, Quit."""
+
+
+def _scan_mount_points(devices: list[tuple[str, int | None]], *, debug: bool = False) -> dict[str, list[str]]:
+    """Mount points per device; reads mountinfo once for all devices."""
+    return get_mount_points([block_name for block_name, _ in devices], read_mountinfo(), _debug=debug)
+
+
+def _menu_rows(
+    devices: list[tuple[str, int | None]], mount_points: dict[str, list[str]]
+) -> list[tuple[str, int | None, list[str]]]:
+    """Return (block_name, speed, mount_points) per device, sorted by block_name so order is stable.
+    Mount points stay unsorted; _get_menu_spec sorts them only when the menu actually changes."""
+    return sorted(
+        ((block_name, speed, mount_points.get(block_name, [])) for block_name, speed in devices),
+        key=lambda r: r[0],
+    )
+
+
+def _menu_state(rows: list[tuple[str, int | None, list[str]]]) -> tuple[tuple[str, int | None, frozenset], ...]:
+    """Return comparable state for change detection without sorting: each device's mounts as a multiset
+    (order ignored, duplicates from stacked mounts kept, as in the label)."""
+    return tuple((block_name, speed, frozenset(Counter(mounts).items())) for block_name, speed, mounts in rows)
+
+
+def _get_menu_spec(rows: list[tuple[str, int | None, list[str]]] | None) -> list[dict]:
+    """Build menu spec from _menu_rows: device rows, separator, Quit. rows is None until the first scan finished."""
     spec: list[dict] = []
-    if not devices:
-        spec.append({_SPEC_TYPE: _SPEC_ITEM, _SPEC_LABEL: "No USB storage", _SPEC_ENABLED: False})
+    if rows is None:
+        spec.append({_SPEC_TYPE: _SPEC_ITEM, _SPEC_KEY: "none", _SPEC_LABEL: "Scanning USB storage…", _SPEC_ENABLED: False})
+    elif not rows:
+        spec.append({_SPEC_TYPE: _SPEC_ITEM, _SPEC_KEY: "none", _SPEC_LABEL: "No USB storage", _SPEC_ENABLED: False})
     else:
-        for block_name, speed in devices:
+        for block_name, speed, mounts in rows:
             label = f"{block_name}: {format_speed(speed)}"
-            mounts = get_mount_points(block_name, _debug=debug)
             if mounts:
                 label += " — " + ", ".join(sorted(mounts))
             spec.append({
                 _SPEC_TYPE: _SPEC_ITEM,
+                _SPEC_KEY: f"device:{block_name}",
                 _SPEC_LABEL: label,
                 _SPEC_ENABLED: False,
             })
-    spec.append({_SPEC_TYPE: _SPEC_SEPARATOR})
-    spec.append({_SPEC_TYPE: _SPEC_ITEM, _SPEC_LABEL: "Quit", _SPEC_ENABLED: True, _SPEC_CALLBACK: _exit_tray})
+    spec.append({_SPEC_TYPE: _SPEC_SEPARATOR, _SPEC_KEY: "separator"})
+    spec.append({_SPEC_TYPE: _SPEC_ITEM, _SPEC_KEY: "quit", _SPEC_LABEL: "Quit", _SPEC_ENABLED: True, _SPEC_CALLBACK: _exit_tray})
     return spec
 
 
@@ -320,7 +248,7 @@ def run() -> None:
             stream=sys.stderr,
         )
         logger.debug("debug logging enabled")
-    if not APPINDICATOR_AVAILABLE:
+    if not _load_gtk_backend():
         print(
             "Tray requires AppIndicator3 + GTK3. On Arch: pacman -S libappindicator-gtk3 gtk3",
             file=sys.stderr,
@@ -329,11 +257,10 @@ def run() -> None:
     if args.debug:
         logger.debug("tray app starting, refresh interval %s ms", REFRESH_INTERVAL_MS)
 
-    # Runtime SVG → PNG in temp (same pattern as rclone-bisync-manager).
-    icon_path = Path(tempfile.gettempdir()) / _TRAY_ICON_FILENAME
-    _render_tray_icon_to_path(icon_path)
+    # SVG → PNG rendered once into the user cache, reused on later starts.
+    icon_path = _tray_icon_path()
     if args.debug:
-        logger.debug("tray icon rendered to %s", icon_path)
+        logger.debug("tray icon at %s", icon_path)
 
     indicator = AppIndicator3.Indicator.new(
         _APP_ID,
@@ -342,45 +269,66 @@ def run() -> None:
     )
     indicator.set_status(AppIndicator3.IndicatorStatus.ACTIVE)
 
-    # Build initial menu once (sort by block_name so order is stable across polls)
-    devices = sorted(get_usb_storage_speeds(), key=lambda d: d[0])
-    initial_state = _menu_state(devices, debug=args.debug)
-    spec = _get_menu_spec(devices, debug=args.debug)
-    menu = _build_gtk_menu(spec)
-    if menu is not None:
-        indicator.set_menu(menu)
+    # Initial menu is a placeholder; the first scan runs in poll_loop so no sysfs/procfs I/O happens on the GTK thread.
+    spec = _get_menu_spec(None)
+    menu = Gtk.Menu()
+    menu_items: dict[str, Gtk.MenuItem] = {}
+    _sync_gtk_menu(menu, menu_items, spec)
+    indicator.set_menu(menu)  # only once; later updates mutate this menu in place
 
     def _spec_labels(spec: list[dict]) -> tuple[str, ...]:
-        """Labels of menu items (order preserved) for identity check; skip set_menu when identical."""
+        """Labels of menu items (order preserved) for identity check; skip menu update when identical."""
         return tuple(s.get(_SPEC_LABEL, "") for s in spec if s.get(_SPEC_TYPE) == _SPEC_ITEM)
 
     _last_labels: list[tuple[str, ...] | None] = [_spec_labels(spec)]
 
-    def apply_menu_update(devices: list[tuple[str, int | None]]) -> bool:
-        """Run on main thread: rebuild and set menu only when display (labels) actually changed."""
-        devices = sorted(devices, key=lambda d: d[0])  # same order as initial_state so labels match when unchanged
-        spec = _get_menu_spec(devices, debug=args.debug)
+    def apply_menu_update(rows: list[tuple[str, int | None, list[str]]]) -> bool:
+        """Run on main thread: update menu items in place only when display (labels) actually changed."""
+        spec = _get_menu_spec(rows)
         labels = _spec_labels(spec)
         if labels == _last_labels[0]:
-            return False  # menu is identical, skip set_menu to avoid any redraw
+            return False  # menu is identical, skip any widget update to avoid redraw
         _last_labels[0] = labels
-        menu = _build_gtk_menu(spec)
-        if menu is not None:
-            indicator.set_menu(menu)
+        _sync_gtk_menu(menu, menu_items, spec)
         if args.debug:
-            logger.debug("apply_menu_update: %s device(s), menu refreshed", len(devices))
+            logger.debug("apply_menu_update: %s device(s), menu updated", len(rows))
         return False  # GLib.idle_add: return False to remove source
 
     def poll_loop() -> None:
-        """Background thread: poll devices/mounts; only schedule menu update when state changes (like rclone tray)."""
-        last_state: list[tuple[tuple[str, int | None, tuple[str, ...]], ...] | None] = [initial_state]
+        """Background thread: full rescan on device/mount events, only link speed re-reads on the refresh timeout;
+        only schedule menu update when state changes (like rclone tray). All I/O happens here, widgets via GLib.idle_add."""
+        last_state: list[tuple[tuple[str, int | None, frozenset], ...] | None] = [None]
+        uevent_sock = open_uevent_socket()
+        mountinfo_fd = open_mountinfo_watch()
+        poller = select.poll()
+        if uevent_sock is not None:
+            poller.register(uevent_sock, select.POLLIN)
+        if mountinfo_fd is not None:
+            poller.register(mountinfo_fd, select.POLLPRI)
+        interval_ms = REFRESH_INTERVAL_MS if uevent_sock is not None else _FALLBACK_REFRESH_INTERVAL_MS
+        if args.debug:
+            logger.debug("poll_loop: uevents %s, mountinfo watch %s, interval %s ms",
+                         uevent_sock is not None, mountinfo_fd is not None, interval_ms)
+        # Without either event source a timeout may hide device or mount changes, so every wakeup rescans.
+        events_complete = uevent_sock is not None and mountinfo_fd is not None
+        devices: list[tuple[str, int | None]] = []
+        mount_points: dict[str, list[str]] = {}
+        reason = "startup"
         while True:
-            time.sleep(REFRESH_INTERVAL_MS / 1000.0)
-            devices = sorted(get_usb_storage_speeds(), key=lambda d: d[0])
-            state = _menu_state(devices, debug=args.debug)
+            if reason == "timeout" and events_complete:
+                devices = read_link_speeds([block_name for block_name, _ in devices])
+            else:
+                devices = get_usb_storage_speeds()
+                mount_points = _scan_mount_points(devices, debug=args.debug)
+            # rows are sorted by block_name so order is stable across polls
+            rows = _menu_rows(devices, mount_points)
+            state = _menu_state(rows)
+            if args.debug:
+                logger.debug("poll_loop: %s (%s)", "speed refresh" if reason == "timeout" and events_complete else "rescan", reason)
             if state != last_state[0]:
                 last_state[0] = state
-                GLib.idle_add(apply_menu_update, devices)
+                GLib.idle_add(apply_menu_update, rows)
+            reason = "event" if wait_for_change(poller, uevent_sock, interval_ms) else "timeout"
 
     Thread(target=poll_loop, daemon=True).start()
 
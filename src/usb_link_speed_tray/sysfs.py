@@ -0,0 +1,355 @@
+"""Kernel-side helpers: USB block devices and link speeds from sysfs, mount points from procfs, change notification."""
+
+from __future__ import annotations
+
+import errno
+import logging
+import math
+import os
+import select
+import socket
+import time
+from pathlib import Path
+
+SYS_BLOCK = Path("/sys/block")
+SYS_USB_DEVICES = Path("/sys/bus/usb/devices")
+PROC_MOUNTINFO = Path("/proc/self/mountinfo")
+# Checked once at import: these always exist on Linux, the checks only guard non-Linux runs.
+_HAS_SYSBLOCK = os.path.isdir(SYS_BLOCK)
+_HAS_MOUNTINFO = os.path.exists(PROC_MOUNTINFO)
+_EVENT_SETTLE_MS = 500  # coalesce the burst of uevents from one hotplug into one rescan
+_EVENT_SETTLE_MAX_MS = 2000  # but never delay the rescan longer than this under steady event traffic
+_NETLINK_KOBJECT_UEVENT = 15
+_UEVENT_KERNEL_GROUP = 1
+_UEVENT_BUFSIZE = 1 << 16
+_UEVENT_BLOCK = b"SUBSYSTEM=block"
+_UEVENT_SUBSYSTEMS = frozenset({_UEVENT_BLOCK, b"SUBSYSTEM=usb"})
+_MOUNTINFO_READ_SIZE = 1 << 17
+_SYSFS_READ_SIZE = 64
+_DM_DEVICE_PREFIXES = ("/dev/mapper/", "/dev/dm-")
+
+logger = logging.getLogger(__name__)
+
+# block_name -> usb_path (None: not USB). Cleared on block uevents (see _invalidate_block_caches).
+_usb_path_cache: dict[str, str | None] = {}
+# block_name -> major:minor set. kernfs dir times do not change when partitions appear, so this is cleared
+# on block uevents instead (see _invalidate_block_caches).
+_dev_numbers_cache: dict[str, frozenset[str]] = {}
+# dm_name -> slave names. Like partitions, slave links do not touch the slaves dir's mtime; cleared on block uevents.
+_dm_slaves_cache: dict[str, frozenset[str]] = {}
+
+
+def _readlink_abs(path: str) -> str:
+    """Follow one symlink level and return the absolute, normalized target (single readlink, no per-component lstat)."""
+    return os.path.normpath(os.path.join(os.path.dirname(path), os.readlink(path)))
+
+
+def _device_name(device_path: str) -> str:
+    """Kernel name for a /dev path: follows one symlink (/dev/disk/by-*, /dev/mapper/X), else the path's own name."""
+    try:
+        return os.path.basename(os.readlink(device_path))
+    except (OSError, ValueError):
+        return os.path.basename(device_path)
+
+
+def _is_usb_part(part: str) -> bool:
+    """True for a USB root hub path component (usb1, usb2, ...)."""
+    return part.startswith("usb") and len(part) > 3 and part[3:].isdigit()
+
+
+def _block_device_usb_path(block_name: str) -> str | None:
+    """Resolve block device (e.g. sda) to USB bus path (e.g. 2-3). Cached until the next block uevent."""
+    try:
+        return _usb_path_cache[block_name]
+    except KeyError:
+        pass
+    usb_path = _resolve_block_device_usb_path(os.path.join(SYS_BLOCK, block_name))
+    _usb_path_cache[block_name] = usb_path
+    return usb_path
+
+
+def _resolve_block_device_usb_path(block_link: str) -> str | None:
+    """Uncached lookup for _block_device_usb_path; block_link is /sys/block/<dev>."""
+    try:
+        # /sys/block/<dev> and its "device" are normally single symlinks; the latter is relative to the real block dir.
+        try:
+            block_dir = _readlink_abs(block_link)
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+            block_dir = block_link  # a real directory (older sysfs layouts), not a link
+        parts = _readlink_abs(os.path.join(block_dir, "device")).split("/")
+        for idx, part in enumerate(parts):
+            if _is_usb_part(part):
+                return parts[idx + 1] if idx + 1 < len(parts) else None
+        return None
+    except (OSError, ValueError):
+        return None
+
+
+def _read_small(path: str) -> bytes:
+    """Read a small sysfs pseudo-file (speed, dev) with one raw os.read; no buffered/text wrapper."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, _SYSFS_READ_SIZE)
+    finally:
+        os.close(fd)
+
+
+def _read_speed_mbps(usb_path: str) -> int | None:
+    """Read link speed in Mbps from sysfs."""
+    try:
+        return int(_read_small(os.path.join(SYS_USB_DEVICES, usb_path, "speed")))
+    except (OSError, ValueError):
+        return None
+
+
+def _get_block_dev_numbers(block_name: str, *, _debug: bool = False) -> frozenset[str]:
+    """Return set of major:minor for this block device and its partitions (e.g. {'8:0', '8:1'}).
+    Cached until the next block uevent (see _invalidate_block_caches)."""
+    cached = _dev_numbers_cache.get(block_name)
+    if cached is not None:
+        return cached
+    result = frozenset(_scan_block_dev_numbers(block_name, os.path.join(SYS_BLOCK, block_name)))
+    if _debug:
+        logger.debug("_get_block_dev_numbers: %s rescanned -> %s", block_name, result)
+    _dev_numbers_cache[block_name] = result
+    return result
+
+
+def _scan_block_dev_numbers(block_name: str, block_dir: str) -> set[str]:
+    """Uncached scan for _get_block_dev_numbers: the block's own dev file plus each partition's."""
+    result: set[str] = set()
+    try:
+        result.add(_read_small(os.path.join(block_dir, "dev")).strip().decode("ascii"))
+    except (OSError, ValueError):
+        pass
+    prefix = block_name
+    try:
+        with os.scandir(block_dir) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                name = entry.name
+                if name.startswith(prefix) and len(name) > len(prefix) and name[len(prefix)].isdigit():
+                    try:
+                        result.add(_read_small(os.path.join(entry.path, "dev")).strip().decode("ascii"))
+                    except (OSError, ValueError):
+                        pass
+    except OSError:
+        pass
+    return result
+
+
+def _is_block_or_partition(name: str, block_name: str) -> bool:
+    """True if kernel name is this block or one of its partitions (e.g. sda1 -> sda)."""
+    if name == block_name:
+        return True
+    return name.startswith(block_name) and len(name) > len(block_name) and name[len(block_name)].isdigit()
+
+
+def _dm_slaves(dm_name: str) -> frozenset[str]:
+    """Names in /sys/block/<dm>/slaves (e.g. {'sda1'}). Cached until the next block uevent (see _invalidate_block_caches)."""
+    cached = _dm_slaves_cache.get(dm_name)
+    if cached is not None:
+        return cached
+    try:
+        with os.scandir(os.path.join(SYS_BLOCK, dm_name, "slaves")) as it:
+            slaves = frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+    _dm_slaves_cache[dm_name] = slaves
+    return slaves
+
+
+def _parse_mountinfo_line(line: bytes):
+    """Parse one mountinfo line. Returns (major_minor, mount_point, device_path) or None.
+    Fields up to the mount point are fixed; the source follows the ' - ' separator after the optional fields.
+    Successive partitions only slice out the fields that are used."""
+    _, _, rest = line.partition(b" ")  # mount ID
+    _, _, rest = rest.partition(b" ")  # parent ID
+    major_minor, _, rest = rest.partition(b" ")
+    _, _, rest = rest.partition(b" ")  # root
+    mount_point, sep, rest = rest.partition(b" ")
+    if not sep:
+        return None
+    major_minor_str = major_minor.decode("ascii", "replace")
+    mount_point_str = mount_point.replace(b"\\040", b" ").decode("utf-8", "replace")
+    _, sep, rest = rest.partition(b" - ")
+    if not sep:
+        return (major_minor_str, mount_point_str, "")
+    _, _, rest = rest.partition(b" ")  # filesystem type
+    device_path, _, _ = rest.partition(b" ")
+    return (major_minor_str, mount_point_str, device_path.decode("utf-8", "replace"))
+
+
+def read_mountinfo() -> list[tuple[str, str, str]]:
+    """Read and parse /proc/self/mountinfo once. Returns list of (major_minor, mount_point, device_path).
+    Raw os.read on one fd: procfs regenerates the file per read, so read it whole once per refresh."""
+    result: list[tuple[str, str, str]] = []
+    if not _HAS_MOUNTINFO:
+        return result
+    chunks: list[bytes] = []
+    try:
+        fd = os.open(PROC_MOUNTINFO, os.O_RDONLY)
+        try:
+            while True:
+                chunk = os.read(fd, _MOUNTINFO_READ_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+    except OSError:
+        return result
+    for line in b"".join(chunks).split(b"\n"):
+        parsed = _parse_mountinfo_line(line)
+        if parsed is not None:
+            result.append(parsed)
+    return result
+
+
+def get_mount_points(
+    block_names: list[str], mountinfo: list[tuple[str, str, str]], *, _debug: bool = False
+) -> dict[str, list[str]]:
+    """Return mount points per block device from parsed mountinfo (see read_mountinfo), in one pass over the table.
+    Matches by major:minor (8:0, 8:1), by device path (/dev/sda, /dev/sda1), or by dm device backed by this block (e.g. VeraCrypt)."""
+    result: dict[str, list[str]] = {name: [] for name in block_names}
+    block_by_dev_number: dict[str, str] = {}
+    for block_name in result:
+        dev_numbers = _get_block_dev_numbers(block_name, _debug=_debug)
+        if _debug:
+            logger.debug("get_mount_points: %s dev_numbers %s", block_name, dev_numbers)
+        block_by_dev_number.update(dict.fromkeys(dev_numbers, block_name))
+    for major_minor, mount_point, device_path in mountinfo:
+        owner = block_by_dev_number.get(major_minor)
+        if owner is not None:
+            # A major:minor is one block or partition, so no other device can match this line by name.
+            result[owner].append(mount_point)
+            continue
+        if not device_path.startswith("/dev/"):
+            continue
+        name = _device_name(device_path)  # one readlink per line, not per device
+        # dm device (e.g. /dev/mapper/veracrypt1 -> dm-0): matches every block backing it, e.g. LVM across two disks.
+        is_dm = device_path.startswith(_DM_DEVICE_PREFIXES) and name.startswith("dm-")
+        slaves = _dm_slaves(name) if is_dm else ()
+        for block_name in result:
+            if _is_block_or_partition(name, block_name) or any(_is_block_or_partition(s, block_name) for s in slaves):
+                result[block_name].append(mount_point)
+    if _debug:
+        logger.debug("get_mount_points: %s", result)
+    return result
+
+
+def get_usb_storage_speeds() -> list[tuple[str, int | None]]:
+    """Return list of (block_name, speed_mbps) for USB block devices."""
+    result: list[tuple[str, int | None]] = []
+    if not _HAS_SYSBLOCK:
+        logger.debug("sys block path does not exist: %s", SYS_BLOCK)
+        return result
+    with os.scandir(SYS_BLOCK) as it:
+        for entry in it:
+            # /sys/block entries are symlinks to the device dirs; d_type answers both checks without a stat.
+            if not (entry.is_symlink() or entry.is_dir(follow_symlinks=False)):
+                continue
+            name = entry.name
+            usb_path = _block_device_usb_path(name)
+            if usb_path is None:
+                logger.debug("block %s is not USB, skipping", name)
+                continue
+            speed = _read_speed_mbps(usb_path)
+            logger.debug("USB block %s path %s speed %s Mbps", name, usb_path, speed)
+            result.append((name, speed))
+    return result
+
+
+def read_link_speeds(block_names: list[str]) -> list[tuple[str, int | None]]:
+    """Re-read link speeds of already known USB block devices: no /sys/block scan, USB paths come from the cache."""
+    result: list[tuple[str, int | None]] = []
+    for name in block_names:
+        usb_path = _block_device_usb_path(name)
+        if usb_path is not None:
+            result.append((name, _read_speed_mbps(usb_path)))
+    return result
+
+
+def open_uevent_socket() -> socket.socket | None:
+    """Non-blocking netlink socket for kernel uevents (what udev listens to), or None if unavailable.
+    inotify is no use here: sysfs does not emit events for kernel-created entries under /sys/block."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_KOBJECT_UEVENT)
+    except (AttributeError, OSError) as e:
+        logger.debug("uevent socket unavailable: %s", e)
+        return None
+    try:
+        sock.bind((0, _UEVENT_KERNEL_GROUP))
+        sock.setblocking(False)
+    except OSError as e:
+        logger.debug("uevent socket bind failed: %s", e)
+        sock.close()
+        return None
+    return sock
+
+
+def open_mountinfo_watch() -> int | None:
+    """fd on /proc/self/mountinfo; poll() reports POLLPRI on it whenever the mount table changes."""
+    try:
+        return os.open(PROC_MOUNTINFO, os.O_RDONLY)
+    except OSError as e:
+        logger.debug("mountinfo watch unavailable: %s", e)
+        return None
+
+
+def _invalidate_block_caches() -> None:
+    """Drop cached sysfs lookups; called on block uevents (add/remove/change, incl. partitions)."""
+    _usb_path_cache.clear()
+    _dev_numbers_cache.clear()
+    _dm_slaves_cache.clear()  # dm reload / pvmove emit a change uevent on the dm device
+
+
+def _drain_uevents(sock: socket.socket) -> bool:
+    """Read all pending uevents. True if any concerns block or USB devices (or events were lost).
+    Block events also invalidate the sysfs caches."""
+    relevant = False
+    while True:
+        try:
+            msg = sock.recv(_UEVENT_BUFSIZE)
+        except BlockingIOError:
+            return relevant
+        except OSError:
+            _invalidate_block_caches()
+            return True  # e.g. ENOBUFS: events dropped, rescan to be safe
+        fields = msg.split(b"\0")
+        if _UEVENT_BLOCK in fields:
+            _invalidate_block_caches()
+            relevant = True
+        elif not relevant and not _UEVENT_SUBSYSTEMS.isdisjoint(fields):
+            relevant = True
+
+
+def wait_for_change(poller: select.poll, uevent_sock: socket.socket | None, timeout_ms: int) -> bool:
+    """Block until a relevant uevent or mount table change (True) or until timeout_ms elapses (False).
+    After a change, keeps waiting until _EVENT_SETTLE_MS pass without another relevant one, so one hotplug
+    burst causes one rescan; the settle phase ends after _EVENT_SETTLE_MAX_MS or at the timeout at the latest."""
+    if uevent_sock is None:
+        _invalidate_block_caches()  # nothing would tell us about repartitioning; rescan sysfs every time
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    settle_until: float | None = None
+    settle_cap = deadline
+    while True:
+        now = time.monotonic()
+        end = deadline if settle_until is None else min(settle_until, settle_cap)
+        if now >= end:
+            return settle_until is not None
+        events = poller.poll(math.ceil((end - now) * 1000))
+        relevant = False
+        for fd, _ in events:
+            if uevent_sock is not None and fd == uevent_sock.fileno():
+                relevant = _drain_uevents(uevent_sock) or relevant
+            else:
+                relevant = True
+        if relevant:
+            now = time.monotonic()
+            if settle_until is None:
+                settle_cap = min(now + _EVENT_SETTLE_MAX_MS / 1000.0, deadline)
+            settle_until = now + _EVENT_SETTLE_MS / 1000.0